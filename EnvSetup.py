@@ -6,12 +6,30 @@ Test version to ensure basic functionality
 
 import os
 import sys
+import array
 import time
 import json
 import logging
 import argparse
-from datetime import datetime
-from flask import Flask, jsonify
+import itertools
+from importlib.metadata import distribution, PackageNotFoundError
+from flask import Flask, Response
+
+try:
+    # Ahead-of-time compiled benchmark kernel, produced by build_kernels.py
+    import smartbench_kernels
+except ImportError:
+    smartbench_kernels = None
+
+try:
+    from gevent.pywsgi import WSGIServer
+except ImportError:
+    WSGIServer = None
+
+try:
+    import pynvml
+except ImportError:
+    pynvml = None
 
 # Configure logging
 logging.basicConfig(
@@ -20,65 +38,140 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Constant fields of the mock DCIM payloads, built once at import. The
+# randomized fields are left as None placeholders so handlers only patch
+# them per request and the key order of the responses is preserved.
+_RACK_TEMPLATE = [
+    {
+        'id': f'rack-{i:02d}',
+        'location': f'Row-{(i-1)//2 + 1}',
+        'power_consumption_watts': None,
+        'pdu_id': f'pdu-{i:02d}',
+        'pdu_status': 'operational'
+    }
+    for i in range(1, 4)
+]
+
+_SENSOR_TEMPLATE = [
+    {
+        'id': f'temp-{i:02d}',
+        'location': loc,
+        'type': sensor_type,
+        'temperature_celsius': None
+    }
+    for i, (loc, sensor_type) in enumerate(zip(
+        ['rack-01', 'rack-02', 'server-room'],
+        ['ambient', 'supply', 'return']
+    ))
+]
+
+_COOLING_TEMPLATE = [
+    {
+        'id': f'crac-{i:02d}',
+        'location': f'Zone-{i}',
+        'status': None,
+        'capacity_kw': 50,
+        'current_load_percent': None
+    }
+    for i in range(1, 4)
+]
+
+_COOLING_STATUSES = ['operational', 'warning']
+_COOLING_STATUS_P = [0.75, 0.25]
+
+# Each handler slices its values out of a pool of 64k pre-drawn samples
+# instead of calling the RNG per request. Pools carry a few extra entries
+# so a slice starting near the end never comes up short.
+_POOL_SIZE = 1 << 16
+_POOL_MASK = _POOL_SIZE - 1
+
+def _pool_slice(pool, counter, n):
+    """Return the next n pre-drawn values from pool as Python scalars"""
+    i = next(counter) & _POOL_MASK
+    return pool[i:i + n].tolist()
+
 def create_mock_dcim_server():
     """Create mock DCIM server for testing"""
+    # numpy and orjson are only needed by the mock server, so the other
+    # modes can still run (and report them missing) when they aren't installed
+    import numpy as np
+    import orjson
+    
+    def ojsonify(obj):
+        """Serialize obj with orjson and wrap it in a JSON response"""
+        return Response(orjson.dumps(obj), mimetype='application/json')
+    
+    health_body = orjson.dumps({'status': 'healthy', 'service': 'Mock DCIM Server'})
+    health_headers = [
+        ('Content-Type', 'application/json'),
+        ('Content-Length', str(len(health_body)))
+    ]
+    
     app = Flask(__name__)
+    rng = np.random.default_rng()
+    
+    n_racks = len(_RACK_TEMPLATE)
+    n_sensors = len(_SENSOR_TEMPLATE)
+    n_units = len(_COOLING_TEMPLATE)
+    
+    # Counters step by the slice length so consecutive requests don't share draws
+    power_pool = rng.integers(7500, 8500, size=_POOL_SIZE + n_racks, endpoint=True, dtype=np.int32)
+    power_idx = itertools.count(0, n_racks)
+    temp_pool = rng.uniform(20, 30, size=_POOL_SIZE + n_sensors).round(1)
+    temp_idx = itertools.count(0, n_sensors)
+    status_pool = rng.choice(_COOLING_STATUSES, size=_POOL_SIZE + n_units, p=_COOLING_STATUS_P)
+    load_pool = rng.integers(60, 85, size=_POOL_SIZE + n_units, endpoint=True, dtype=np.int32)
+    cooling_idx = itertools.count(0, n_units)
     
     @app.route('/api/v2/racks/power')
     def get_rack_power():
-        import random
-        racks = []
-        for i in range(1, 4):
-            racks.append({
-                'id': f'rack-{i:02d}',
-                'location': f'Row-{(i-1)//2 + 1}',
-                'power_consumption_watts': random.randint(7500, 8500),
-                'pdu_id': f'pdu-{i:02d}',
-                'pdu_status': 'operational'
-            })
+        powers = _pool_slice(power_pool, power_idx, n_racks)
+        racks = [
+            {**tmpl, 'power_consumption_watts': power}
+            for tmpl, power in zip(_RACK_TEMPLATE, powers)
+        ]
         logger.info(f"Mock DCIM: Serving power data for {len(racks)} racks")
-        return jsonify({'racks': racks})
+        return ojsonify({'racks': racks})
     
     @app.route('/nlyte/api/v1/sensors/temperature')
     def get_temperature():
-        import random
-        sensors = []
-        locations = ['rack-01', 'rack-02', 'server-room']
-        types = ['ambient', 'supply', 'return']
-        
-        for i, (loc, sensor_type) in enumerate(zip(locations, types)):
-            sensors.append({
-                'id': f'temp-{i:02d}',
-                'location': loc,
-                'type': sensor_type,
-                'temperature_celsius': round(random.uniform(20, 30), 1)
-            })
+        temps = _pool_slice(temp_pool, temp_idx, n_sensors)
+        sensors = [
+            {**tmpl, 'temperature_celsius': temp}
+            for tmpl, temp in zip(_SENSOR_TEMPLATE, temps)
+        ]
         logger.info(f"Mock DCIM: Serving temperature data for {len(sensors)} sensors")
-        return jsonify({'sensors': sensors})
+        return ojsonify({'sensors': sensors})
     
     @app.route('/nlyte/api/v1/cooling/units')
     def get_cooling_status():
-        import random
-        units = []
-        for i in range(1, 4):
-            units.append({
-                'id': f'crac-{i:02d}',
-                'location': f'Zone-{i}',
-                'status': random.choice(['operational', 'operational', 'operational', 'warning']),
-                'capacity_kw': 50,
-                'current_load_percent': random.randint(60, 85)
-            })
+        # Status and load pools are read at the same offset
+        i = next(cooling_idx) & _POOL_MASK
+        statuses = status_pool[i:i + n_units].tolist()
+        loads = load_pool[i:i + n_units].tolist()
+        units = [
+            {**tmpl, 'status': status, 'current_load_percent': load}
+            for tmpl, status, load in zip(_COOLING_TEMPLATE, statuses, loads)
+        ]
         logger.info(f"Mock DCIM: Serving cooling data for {len(units)} units")
-        return jsonify({'cooling_units': units})
+        return ojsonify({'cooling_units': units})
     
     @app.route('/health')
     def health_check():
-        return jsonify({
-            'status': 'healthy',
-            'service': 'Mock DCIM Server',
-            'timestamp': datetime.now().isoformat()
-        })
+        # Only reached for non-GET methods; GET is answered by the WSGI shortcut
+        return Response(health_body, mimetype='application/json')
+    
+    # Answer GET /health before Flask's routing runs, since orchestrators
+    # poll it constantly and the body never changes
+    inner_wsgi_app = app.wsgi_app
+    
+    def health_shortcut(environ, start_response):
+        if environ.get('PATH_INFO') == '/health' and environ.get('REQUEST_METHOD') == 'GET':
+            start_response('200 OK', health_headers)
+            return [health_body]
+        return inner_wsgi_app(environ, start_response)
     
+    app.wsgi_app = health_shortcut
     return app
 
 def test_basic_functionality():
@@ -134,44 +227,107 @@ def run_mock_dcim_server(port=8080):
     app = create_mock_dcim_server()
     
     try:
-        app.run(host='0.0.0.0', port=port, debug=False)
+        if WSGIServer is not None:
+            WSGIServer(('0.0.0.0', port), app).serve_forever()
+        else:
+            print("⚠️  gevent not available, using Flask development server")
+            app.run(host='0.0.0.0', port=port, debug=False)
     except KeyboardInterrupt:
         print("\n🛑 Mock DCIM Server stopped by user")
     except Exception as e:
         print(f"❌ Server error: {e}")
 
-def run_quick_benchmark():
+def _sum_sq(n):
+    """Sum of squares kernel used by the CPU benchmark"""
+    s = 0
+    for i in range(n):
+        s += i * i
+    return s
+
+def _jit_sum_sq():
+    """JIT-compile _sum_sq with Numba on first use (None if numba is missing)"""
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+    return njit(cache=True)(_sum_sq)
+
+_NVML_HANDLES = None
+
+def _nvml_handles():
+    """Initialize NVML once and cache the device handles (empty if no driver)"""
+    global _NVML_HANDLES
+    if _NVML_HANDLES is None:
+        try:
+            pynvml.nvmlInit()
+            _NVML_HANDLES = [
+                pynvml.nvmlDeviceGetHandleByIndex(i)
+                for i in range(pynvml.nvmlDeviceGetCount())
+            ]
+        except pynvml.NVMLError:
+            _NVML_HANDLES = []
+    return _NVML_HANDLES
+
+def run_quick_benchmark(jit=True):
     """Run a quick performance benchmark"""
     print("🏃‍♂️ Running Quick Performance Benchmark...")
     
     # CPU benchmark
-    import time
-    start_time = time.time()
+    kernel = _sum_sq
+    label = "CPython"
+    if jit and smartbench_kernels is not None:
+        # Prebuilt shared library: no numba import and no compile step
+        kernel = smartbench_kernels.sum_sq
+        label = "Numba AOT"
+    elif jit:
+        sum_sq_jit = _jit_sum_sq()
+        if sum_sq_jit is not None:
+            # Warm up outside the timed region so compile time is not measured
+            sum_sq_jit(1)
+            kernel = sum_sq_jit
+            label = "Numba JIT"
+        else:
+            print("⚠️  Numba not available, falling back to CPython kernel")
+    
+    # Simple CPU intensive task, best of several runs so a single noisy
+    # call doesn't dominate; the compiled kernels finish in microseconds
+    timings = []
+    for _ in range(5):
+        start_time = time.perf_counter()
+        result = kernel(100000)
+        timings.append(time.perf_counter() - start_time)
+    cpu_time_us = min(timings) * 1e6
     
-    # Simple CPU intensive task
-    result = sum(i * i for i in range(100000))
-    cpu_time = time.time() - start_time
+    print(f"✅ CPU Benchmark ({label}): {cpu_time_us:.1f} µs best of {len(timings)} (result: {result})")
     
-    print(f"✅ CPU Benchmark: {cpu_time:.4f} seconds (result: {result})")
+    # Memory benchmark: contiguous int32 buffer vs a list of boxed ints
+    data = array.array('i', range(10000))
+    memory_usage = data.buffer_info()[1] * data.itemsize
     
-    # Memory benchmark
-    import sys
-    data = [i for i in range(10000)]
-    memory_usage = sys.getsizeof(data)
+    boxed = list(range(10000))
+    boxed_usage = sys.getsizeof(boxed) + sum(sys.getsizeof(i) for i in boxed)
     
-    print(f"✅ Memory Benchmark: {len(data)} items, {memory_usage} bytes")
+    print(f"✅ Memory Benchmark: {len(data)} items, {memory_usage} bytes "
+          f"(array.array) vs {boxed_usage} bytes (list)")
     
     # Try GPU benchmark if available
-    try:
-        import GPUtil
-        gpus = GPUtil.getGPUs()
-        if gpus:
-            for i, gpu in enumerate(gpus):
-                print(f"✅ GPU {i}: {gpu.name}, {gpu.temperature}°C, {gpu.load*100:.1f}% util")
-        else:
-            print("⚠️  No GPUs detected")
-    except ImportError:
-        print("⚠️  GPUtil not available, skipping GPU benchmark")
+    if pynvml is None:
+        print("⚠️  pynvml not available, skipping GPU benchmark")
+    else:
+        try:
+            handles = _nvml_handles()
+            if handles:
+                for i, handle in enumerate(handles):
+                    name = pynvml.nvmlDeviceGetName(handle)
+                    if isinstance(name, bytes):
+                        name = name.decode()
+                    temp = pynvml.nvmlDeviceGetTemperature(handle, pynvml.NVML_TEMPERATURE_GPU)
+                    util = pynvml.nvmlDeviceGetUtilizationRates(handle).gpu
+                    print(f"✅ GPU {i}: {name}, {temp}°C, {util:.1f}% util")
+            else:
+                print("⚠️  No GPUs detected")
+        except pynvml.NVMLError as e:
+            print(f"⚠️  NVML query failed ({e}), skipping GPU benchmark")
     
     print("🎉 Quick benchmark completed!")
 
@@ -185,15 +341,14 @@ def show_system_info():
     
     # Check installed packages
     try:
-        import pkg_resources
-        installed_packages = [d.project_name for d in pkg_resources.working_set]
-        core_packages = ['flask', 'requests', 'pyyaml', 'prometheus-client', 'torch', 'gputil']
+        core_packages = ['flask', 'requests', 'pyyaml', 'prometheus-client', 'torch', 'nvidia-ml-py']
         
         print("📦 Package Status:")
         for package in core_packages:
-            if package in installed_packages:
+            try:
+                distribution(package)
                 print(f"   ✅ {package}")
-            else:
+            except PackageNotFoundError:
                 print(f"   ❌ {package} (not installed)")
     except Exception as e:
         print(f"   ⚠️  Could not check packages: {e}")
@@ -208,6 +363,7 @@ Examples:
   python SmartInfra.py --mode test           # Test basic functionality
   python SmartInfra.py --mode mock-dcim      # Start mock DCIM server
   python SmartInfra.py --mode benchmark      # Run quick benchmark
+  python SmartInfra.py --mode benchmark --jit off  # Benchmark the CPython kernel
   python SmartInfra.py --mode info           # Show system information
         """
     )
@@ -226,6 +382,13 @@ Examples:
         help='Port for mock DCIM server (default: 8080)'
     )
     
+    parser.add_argument(
+        '--jit', 
+        choices=['on', 'off'],
+        default='on',
+        help='Use the Numba-compiled kernel for the CPU benchmark (default: on)'
+    )
+    
     args = parser.parse_args()
     
     print("🚀 SmartAI-MLInfrastructure System")
@@ -244,7 +407,7 @@ Examples:
         run_mock_dcim_server(args.port)
         
     elif args.mode == 'benchmark':
-        run_quick_benchmark()
+        run_quick_benchmark(jit=args.jit == 'on')
         
     elif args.mode == 'info':
         show_system_info()
@@ -1,7 +1,136 @@
-from flask import Flask, jsonify
+# gevent's server is only used when this file is run as a script. Patching
+# is a process-wide side effect, so importers of TestServerAPI keep
+# unpatched sockets and run() falls back to Flask's dev server for them.
+WSGIServer = None
+if __name__ == "__main__":
+    try:
+        # Patch sockets before requests is imported so the self-call in
+        # get_remote_metrics yields to the hub instead of blocking the server
+        from gevent import monkey
+        monkey.patch_all()
+        from gevent.pywsgi import WSGIServer
+    except ImportError:
+        pass
+
+from flask import Blueprint, Flask, Response
 import requests
+from requests.adapters import HTTPAdapter
 import json
-from datetime import datetime
+import logging
+import msgspec
+import orjson
+import time
+
+logger = logging.getLogger(__name__)
+
+# Shared session so the localhost self-call reuses a pooled keep-alive connection
+_HTTP = requests.Session()
+_HTTP.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+_HTTP.headers.update({'Accept-Encoding': 'identity'})
+
+def ojsonify(obj):
+    """Serialize obj with orjson and wrap it in a JSON response"""
+    return Response(orjson.dumps(obj), mimetype='application/json')
+
+class Metrics(msgspec.Struct):
+    """Fixed schema for /api/metrics, encoded directly by msgspec"""
+    cpu_usage: str
+    memory_usage: str
+    disk_space: str
+    uptime: str
+    timestamp: str
+
+# [epoch second, formatted timestamp] so the string is only rebuilt once a second
+_TS_CACHE = [0, ""]
+
+def _current_timestamp():
+    """Return the current UTC time as an ISO-8601 string, cached per second"""
+    now = int(time.time())
+    if now != _TS_CACHE[0]:
+        _TS_CACHE[1] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))
+        _TS_CACHE[0] = now
+    return _TS_CACHE[1]
+
+# All API endpoints live on one blueprint, built once at import
+api_bp = Blueprint('api', __name__)
+
+# Route 1: Basic Hello World
+@api_bp.route('/api/response', methods=['GET'])
+def server_response():
+    """Returns a simple   ping  message"""
+    return ojsonify({
+        "message": " server ping message !",
+        "status": "success"
+    })
+
+# Route 2: Hello with name parameter
+@api_bp.route('/api/server_alert', methods=['GET'])
+def get_alert(name):
+    """Returns personalized hello message"""
+    return ojsonify({
+        "message": f"Alert, {name}!",
+        "status": "success",
+        "name": name
+    })
+
+# Route 3: Simulating your metrics example with HTTP request
+@api_bp.route('/api/metrics', methods=['GET'])
+def get_current_metrics():
+    """Returns real-time infrastructure data (simulated via HTTP)"""
+    # This simulates the data you might return
+    data = Metrics(
+        cpu_usage="45%",
+        memory_usage="67%",
+        disk_space="23GB free",
+        uptime="5 days, 3 hours",
+        timestamp=_current_timestamp()
+    )
+
+    # Only format the metrics line when debug logging is enabled
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("metrics %s", data)
+
+    return Response(msgspec.json.encode(data), mimetype='application/json')
+
+# Route 5: New endpoint that makes HTTP request to get metrics
+@api_bp.route('/api/metrics/remote', methods=['GET'])
+def get_remote_metrics():
+    """Makes HTTP request to our own metrics endpoint during runtime"""
+    try:
+        # Make HTTP request to our own server
+        response = _HTTP.get('http://localhost:9000/api/metrics')
+
+        if response.status_code == 200:
+            metrics_data = orjson.loads(response.content)
+
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("remote metrics %s %s", response.status_code, metrics_data)
+
+            return ojsonify({
+                "source": "HTTP Request",
+                "method": "GET /api/metrics",
+                "data": metrics_data,
+                "status": "success"
+            })
+        else:
+            return ojsonify({"error": "Failed to fetch metrics", "status_code": response.status_code})
+
+    except requests.exceptions.ConnectionError:
+        return ojsonify({
+            "error": "Connection failed - make sure server is running",
+            "message": "Try accessing /api/metrics first"
+        })
+    except Exception as e:
+        return ojsonify({"error": str(e)})
+
+# Route 4: POST example
+@api_bp.route('/api/hello', methods=['POST'])
+def post_hello():
+    """Handles POST requests to hello endpoint"""
+    return ojsonify({
+        "message": "Hello from POST request!",
+        "method": "POST"
+    })
 
 class TestServerAPI:
     def __init__(self):
@@ -12,110 +141,27 @@ class TestServerAPI:
     
     def setup_routes(self):
         """
-        This method defines all the API endpoints/routes for our application.
-        It's called once during initialization to register all routes.
+        Registers the module-level api_bp blueprint on this instance's app.
+        The route handlers themselves are defined once at import time.
         """
-        
-        # Route 1: Basic Hello World
-        @self.app.route('/api/response', methods=['GET'])
-        def server_response():
-            """Returns a simple   ping  message"""
-            return jsonify({
-                "message": " server ping message !",
-                "status": "success"
-            })
-        
-        # Route 2: Hello with name parameter
-        @self.app.route('/api/server_alert', methods=['GET'])
-        def get_alert(name):
-            """Returns personalized hello message"""
-            return jsonify({
-                "message": f"Alert, {name}!",
-                "status": "success",
-                "name": name
-            })
-        
-        # Route 3: Simulating your metrics example with HTTP request
-        @self.app.route('/api/metrics', methods=['GET'])
-        def get_current_metrics():
-            """Returns real-time infrastructure data (simulated via HTTP)"""
-            print("🚀 HTTP Request received at /api/metrics")
-            print("📡 Processing request during RUNTIME...")
-            
-            # This simulates the data you might return
-            data = {
-                "cpu_usage": "45%",
-                "memory_usage": "67%",
-                "disk_space": "23GB free",
-                "uptime": "5 days, 3 hours",
-                "timestamp": datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
-            }
-            
-            # Print the metrics data during runtime
-            print("📊 RUNTIME METRICS DATA:")
-            print(f"   CPU Usage: {data['cpu_usage']}")
-            print(f"   Memory Usage: {data['memory_usage']}")
-            print(f"   Disk Space: {data['disk_space']}")
-            print(f"   Uptime: {data['uptime']}")
-            print(f"   Timestamp: {data['timestamp']}")
-            print("✅ Sending JSON response back to client\n")
-            
-            return jsonify(data)
-        
-        # Route 5: New endpoint that makes HTTP request to get metrics
-        @self.app.route('/api/metrics/remote', methods=['GET'])
-        def get_remote_metrics():
-            """Makes HTTP request to our own metrics endpoint during runtime"""
-            print("🌐 Making HTTP request during RUNTIME...")
-            
-            try:
-                # Make HTTP request to our own server
-                response = requests.get('http://localhost:9000/api/metrics')
-                
-                if response.status_code == 200:
-                    metrics_data = response.json()
-                    
-                    print("📥 HTTP Response received:")
-                    print(f"   Status Code: {response.status_code}")
-                    print("📊 FETCHED METRICS VIA HTTP:")
-                    print(f"   CPU Usage: {metrics_data['cpu_usage']}")
-                    print(f"   Memory Usage: {metrics_data['memory_usage']}")
-                    print(f"   Disk Space: {metrics_data['disk_space']}")
-                    print(f"   Uptime: {metrics_data['uptime']}")
-                    print(f"   Timestamp: {metrics_data['timestamp']}")
-                    
-                    return jsonify({
-                        "source": "HTTP Request",
-                        "method": "GET /api/metrics",
-                        "data": metrics_data,
-                        "status": "success"
-                    })
-                else:
-                    return jsonify({"error": "Failed to fetch metrics", "status_code": response.status_code})
-                    
-            except requests.exceptions.ConnectionError:
-                return jsonify({
-                    "error": "Connection failed - make sure server is running",
-                    "message": "Try accessing /api/metrics first"
-                })
-            except Exception as e:
-                return jsonify({"error": str(e)})
-        
-        # Route 4: POST example
-        @self.app.route('/api/hello', methods=['POST'])
-        def post_hello():
-            """Handles POST requests to hello endpoint"""
-            return jsonify({
-                "message": "Hello from POST request!",
-                "method": "POST"
-            })
+        self.app.register_blueprint(api_bp)
     
     def run(self, debug=True, port=9000):
-        """Start the Flask development server"""
-        self.app.run(debug=debug, port=port)
+        """Start the server on gevent's WSGI server when run as a script, else Flask's dev server"""
+        if WSGIServer is None:
+            self.app.run(debug=debug, port=port)
+            return
+        self.app.debug = debug
+        WSGIServer(('127.0.0.1', port), self.app).serve_forever()
 
 # Usage example
 if __name__ == "__main__":
+    # Metrics handlers log at DEBUG; set level=logging.DEBUG to see them
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    
     # Create an instance of our API class
     api = TestServerAPI()
     
@@ -123,15 +169,15 @@ if __name__ == "__main__":
     print("Available endpoints:")
     print("  GET  /api/response          - Basic SERVER response")
     print("  GET  /api/alert             - Alert!")
-    print("  GET  /api/metrics           - System metrics (with runtime printing)")
+    print("  GET  /api/metrics           - System metrics (logged at DEBUG)")
     print("  GET  /api/metrics/remote    - Fetch metrics via HTTP request")
     print("  POST /api/hello             - API via POST")
     print("\nServer running at http://localhost:9000")
     print("\n🔥 RUNTIME DEMO:")
     print("1. Visit: http://localhost:9000/api/metrics")
-    print("   → Will print metrics data in terminal during runtime")
+    print("   → Logs metrics data at DEBUG level during runtime")
     print("2. Visit: http://localhost:9000/api/metrics/remote") 
-    print("   → Will make HTTP request and print response data")
+    print("   → Will make HTTP request and log response data at DEBUG level")
     print("\n" + "="*50)
     
     # Start the server
@@ -145,23 +191,23 @@ STEP-BY-STEP FLOW:
    - Creates Flask app instance: self.app = Flask(__name__)
    - Immediately calls self.setup_routes() to register all endpoints
 
-2. ROUTE REGISTRATION (setup_routes):
-   - Uses decorator pattern: @self.app.route('/path', methods=['GET'])
-   - Each decorator registers a function as a handler for that URL path
-   - Functions are nested inside setup_routes method
+2. ROUTE REGISTRATION (api_bp + setup_routes):
+   - Uses decorator pattern: @api_bp.route('/path', methods=['GET'])
+   - Each decorator records a module-level function on the api_bp blueprint
+   - setup_routes registers that blueprint on the instance's Flask app
 
 3. REQUEST HANDLING:
    - When HTTP request comes in, Flask matches URL to registered route
    - Calls the corresponding function (get_hello, get_current_metrics, etc.)
-   - Function processes request and returns JSON response via jsonify()
+   - Function processes request and returns JSON response via ojsonify()
 
 4. RESPONSE:
-   - jsonify() converts Python dict to JSON HTTP response
+   - ojsonify() serializes the Python dict with orjson into a JSON HTTP response
    - Response sent back to client
 
 WHY THIS PATTERN IS USEFUL:
-- Organizes all routes in one place (setup_routes method)
+- Organizes all routes in one place (the api_bp blueprint)
 - Keeps route definitions separate from app initialization
 - Makes it easy to see all available endpoints at a glance
-- Allows for conditional route registration if needed
+- Handlers are defined once per process, not once per TestServerAPI instance
 """
\ No newline at end of file
@@ -1,81 +1,207 @@
+import html
 import streamlit as st
 import psutil
+import orjson
+import threading
+import time
 from datetime import datetime
 
+try:
+    import pynvml
+except ImportError:
+    pynvml = None
+
+class CpuSampler:
+    """
+    Background thread that measures CPU usage over fixed windows and keeps
+    the latest value. It is the only caller of psutil.cpu_percent, so
+    viewers' reruns can't reset each other's measurement baseline.
+    """
+    
+    def __init__(self, interval=1.0, initial_interval=0.1):
+        self.interval = interval
+        # Block briefly once so the first render shows a real reading
+        self.latest = psutil.cpu_percent(interval=initial_interval)
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+    
+    def _sample(self):
+        while True:
+            self.latest = psutil.cpu_percent(interval=self.interval)
+
+@st.cache_resource
+def _cpu_sampler():
+    return CpuSampler()
+
 def get_cpu_memory_stats():
-    cpu_percent = psutil.cpu_percent(interval=1)
-    memory_percent = psutil.virtual_memory().percent
-    return cpu_percent, memory_percent
+    return _cpu_sampler().latest, psutil.virtual_memory().percent
 
-def get_gpu_stats():
+def _nvml_devices():
+    """Initialize NVML and return (handle, uuid, name) for each device"""
+    pynvml.nvmlInit()
+    devices = []
+    for i in range(pynvml.nvmlDeviceGetCount()):
+        handle = pynvml.nvmlDeviceGetHandleByIndex(i)
+        uuid = pynvml.nvmlDeviceGetUUID(handle)
+        name = pynvml.nvmlDeviceGetName(handle)
+        # Older pynvml releases return bytes for string fields
+        if isinstance(uuid, bytes):
+            uuid = uuid.decode()
+        if isinstance(name, bytes):
+            name = name.decode()
+        devices.append((handle, uuid, name))
+    return devices
+
+def _read_gpu_stats(devices):
     gpu_stats = []
+    for handle, uuid, name in devices:
+        mem = pynvml.nvmlDeviceGetMemoryInfo(handle)
+        memory_total = mem.total // (1024 * 1024)
+        memory_used = mem.used // (1024 * 1024)
+        # Optional readings: unsupported on some boards and in MIG mode, so a
+        # failure blanks that field instead of failing the whole snapshot
+        try:
+            gpu_utilization = pynvml.nvmlDeviceGetUtilizationRates(handle).gpu
+        except pynvml.NVMLError:
+            gpu_utilization = None
+        try:
+            temperature = pynvml.nvmlDeviceGetTemperature(handle, pynvml.NVML_TEMPERATURE_GPU)
+        except pynvml.NVMLError:
+            temperature = None
+        try:
+            power_draw = pynvml.nvmlDeviceGetPowerUsage(handle) // 1000
+        except pynvml.NVMLError:
+            power_draw = None
+        gpu_stats.append({
+            'id': uuid,
+            'name': name,
+            'memory_total': memory_total,
+            'memory_used': memory_used,
+            'memory_free': mem.free // (1024 * 1024),
+            'memory_utilization': round((memory_used / memory_total) * 100, 1),
+            'gpu_utilization': gpu_utilization,
+            'temperature': temperature,
+            'power_draw': power_draw
+        })
+    return gpu_stats
+
+class GpuPoller:
+    """
+    Background thread that queries NVML at a fixed cadence and keeps the
+    latest orjson-encoded snapshot. One poller is shared by every viewer,
+    so the NVML query rate no longer scales with the number of sessions.
+    """
     
-    try:
-        import gpustat
-        gpus = gpustat.new_query()
-        for gpu in gpus.gpus:
-            gpu_stats.append({
-                'id': gpu.uuid,
-                'name': gpu.name,
-                'memory_total': gpu.memory_total,
-                'memory_used': gpu.memory_used,
-                'memory_free': gpu.memory_free,
-                'memory_utilization': round((gpu.memory_used / gpu.memory_total) * 100, 1),
-                'gpu_utilization': gpu.utilization,
-                'temperature': gpu.temperature,
-                'power_draw': getattr(gpu, 'power_draw', None)
-            })
-    except ImportError:
-        st.warning("GPU monitoring requires the 'gpustat' library.")
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self.latest = orjson.dumps([])
+        self.missing_library = pynvml is None
+        self.error = None
+        self._devices = None
+        if self.missing_library:
+            return
+        # Poll once up front so the first render already has a snapshot
+        # (or the error state) instead of an empty list
+        if self._poll_once():
+            self._thread = threading.Thread(target=self._poll, daemon=True)
+            self._thread.start()
+    
+    def _poll_once(self):
+        """Take one snapshot; returns False once polling should stop"""
+        try:
+            if self._devices is None:
+                self._devices = _nvml_devices()
+            # Swapping in a new bytes object is atomic, readers never see a partial snapshot
+            self.latest = orjson.dumps(_read_gpu_stats(self._devices))
+            self.error = None
+        except (pynvml.NVMLError_LibraryNotFound, pynvml.NVMLError_DriverNotLoaded) as e:
+            # No driver on this host; retrying won't change that
+            self.error = str(e)
+            return False
+        except Exception as e:
+            self.error = str(e)
+        return True
+    
+    def _poll(self):
+        while True:
+            time.sleep(self.interval)
+            if not self._poll_once():
+                return
+
+@st.cache_resource
+def _gpu_poller():
+    return GpuPoller()
+
+def get_gpu_stats():
+    poller = _gpu_poller()
+    
+    if poller.missing_library:
+        st.warning("GPU monitoring requires the 'nvidia-ml-py' library.")
         with st.expander("Installation Instructions"):
-            st.code("pip install gpustat", language="bash")
+            st.code("pip install nvidia-ml-py", language="bash")
             st.markdown("**Note:** You may need to restart your application after installing.")
-    except Exception as e:
-        st.error(f"Error getting GPU stats: {e}")
+    elif poller.error:
+        st.error(f"Error getting GPU stats: {poller.error}")
     
-    return gpu_stats
+    # Reruns only read the poller's latest snapshot, never NVML directly
+    return poller.latest
 
-def display_gpu_info(gpu_stats):
+_GPU_CARD_CSS = """
+<style>
+.gpu-card {display: grid; grid-template-columns: repeat(3, 1fr); gap: 1rem; margin-bottom: 1.5rem;}
+.gpu-card h3 {grid-column: 1 / -1; margin: 0;}
+.gpu-card .metric-label {font-size: 0.875rem; opacity: 0.7;}
+.gpu-card .metric-value {font-size: 1.75rem;}
+.gpu-card progress {width: 100%;}
+.gpu-card .caption {font-size: 0.8rem; opacity: 0.6;}
+</style>
+"""
+
+def _metric_html(label, value, extra=""):
+    return (f'<div class="metric"><div class="metric-label">{label}</div>'
+            f'<div class="metric-value">{value}</div>{extra}</div>')
+
+def _gpu_card_html(gpu):
+    gpu_util = gpu.get('gpu_utilization', 'N/A')
+    if isinstance(gpu_util, (int, float)):
+        util_html = _metric_html("GPU Utilization", f"{gpu_util}%",
+                                 f'<progress value="{gpu_util}" max="100"></progress>')
+    else:
+        util_html = _metric_html("GPU Utilization", "N/A")
+    
+    mem_util = gpu.get('memory_utilization', 'N/A')
+    if isinstance(mem_util, (int, float)):
+        mem_usage = f"{gpu['memory_used']} MB / {gpu['memory_total']} MB"
+        mem_html = _metric_html("Memory Usage", f"{mem_util}%",
+                                f'<progress value="{mem_util}" max="100"></progress>'
+                                f'<div class="caption">{mem_usage}</div>')
+    else:
+        mem_html = _metric_html("Memory Usage", mem_util)
+    
+    temp = gpu.get('temperature', 'N/A')
+    power = gpu.get('power_draw', 'N/A')
+    if isinstance(temp, (int, float)):
+        temp_color = "🟢" if temp < 70 else "🟡" if temp < 85 else "🔴"
+        temp_html = _metric_html("Temperature", f"{temp}°C {temp_color}")
+    else:
+        temp_html = _metric_html("Temperature", "N/A")
+    if isinstance(power, (int, float)) and power is not None:
+        power_html = _metric_html("Power Draw", f"{power}W")
+    else:
+        power_html = _metric_html("Power Draw", "N/A")
+    
+    return (f'<div class="gpu-card"><h3>🎮 {html.escape(gpu["name"])}</h3>'
+            f'{util_html}{mem_html}<div>{temp_html}{power_html}</div></div>')
+
+def display_gpu_info(raw_stats):
+    gpu_stats = orjson.loads(raw_stats)
     if not gpu_stats:
         return
     
-    for gpu in gpu_stats:
-        st.markdown(f"### 🎮 {gpu['name']} ")
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            gpu_util = gpu.get('gpu_utilization', 'N/A')
-            if isinstance(gpu_util, (int, float)):
-                st.metric(label="GPU Utilization", value=f"{gpu_util}%")
-                st.progress(float(gpu_util) / 100.0)
-            else:
-                st.metric(label="GPU Utilization", value=gpu_util)
-        
-        with col2:
-            mem_util = gpu.get('memory_utilization', 'N/A')
-            if isinstance(mem_util, (int, float)):
-                mem_usage = f"{gpu['memory_used']} MB / {gpu['memory_total']} MB"
-                st.metric(label="Memory Usage", value=f"{mem_util}%")
-                st.progress(float(mem_util) / 100.0)
-                st.caption(mem_usage)
-            else:
-                st.metric(label="Memory Usage", value=mem_util)
-        
-        with col3:
-            temp = gpu.get('temperature', 'N/A')
-            power = gpu.get('power_draw', 'N/A')
-            
-            if isinstance(temp, (int, float)):
-                temp_color = "🟢" if temp < 70 else "🟡" if temp < 85 else "🔴"
-                st.metric(label="Temperature", value=f"{temp}°C", delta=temp_color)
-            else:
-                st.metric(label="Temperature", value=temp)
-            
-            if isinstance(power, (int, float)) and power is not None:
-                st.metric(label="Power Draw", value=f"{power}W")
-            else:
-                st.metric(label="Power Draw", value="N/A")
+    # Render every GPU in one markdown element so a rerun sends a single
+    # delta instead of one per metric/progress bar
+    cards = "".join(_gpu_card_html(gpu) for gpu in gpu_stats)
+    st.markdown(_GPU_CARD_CSS + cards, unsafe_allow_html=True)
 
 def main():
     st.title("🖥️ System Monitoring Dashboard")
@@ -111,8 +237,8 @@ def main():
     
     with col2:
         st.subheader("🎮 GPU Information")
-        gpu_stats = get_gpu_stats()
-        display_gpu_info(gpu_stats)
+        raw_stats = get_gpu_stats()
+        display_gpu_info(raw_stats)
 
     st.divider()
 
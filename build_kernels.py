@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Ahead-of-time compile the CPU benchmark kernel used by EnvSetup.py
+
+Run once after installing numba:
+  python build_kernels.py
+
+This writes the smartbench_kernels extension module next to this script.
+run_quick_benchmark picks it up automatically and skips the JIT step.
+"""
+
+import os
+from numba.pycc import CC
+
+cc = CC('smartbench_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+@cc.export('sum_sq', 'i8(i8)')
+def sum_sq(n):
+    # Must stay in sync with _sum_sq in EnvSetup.py
+    s = 0
+    for i in range(n):
+        s += i * i
+    return s
+
+if __name__ == '__main__':
+    cc.compile()
+    print(f"✅ Built smartbench_kernels in {cc.output_dir}")